@@ -2,6 +2,7 @@ import os
 import json
 import streamlit as st
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from langchain_groq import ChatGroq
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -9,10 +10,12 @@ from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.chains import create_retrieval_chain
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from utils import get_published_question_papers
-from plagiarism_detector import PlagiarismDetector, PlagiarismDatabase
+
+# Concurrent grading requests sent to the LLM API
+_MAX_GRADING_WORKERS = 8
 
 def update_submission_status(student_email, submission_type, course, title, status, evaluation_result=None):
     """Update the status of a submission in the submission record"""
@@ -112,42 +115,40 @@ def update_submission_status(student_email, submission_type, course, title, stat
         print(f"Error updating submission status: {e}")
         return False
 
-def evaluate_submissions(submission_type, course, question_paper, model_answer, evaluation_criteria, student_submissions):
-    """Evaluate student submissions against question paper and model answers"""
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_pdf_chunks(pdf_bytes):
+    """Load and split an uploaded PDF, cached on the file contents"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_pdf:
+        temp_pdf.write(pdf_bytes)
+        pdf_path = temp_pdf.name
+    
+    try:
+        docs = PyMuPDFLoader(pdf_path).load()
+    finally:
+        os.unlink(pdf_path)
+    
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    return text_splitter.split_documents(docs)
+
+def evaluate_submissions(submission_type, course, question_paper_bytes, model_answer_bytes, evaluation_criteria, student_submissions):
+    """Evaluate submissions against the question paper and model answer, returning (results, all_graded)"""
     # Set up the LLM
     groq_api_key = os.getenv("GROQ_API_KEY")
     llm = ChatGroq(groq_api_key=groq_api_key, model_name="Gemma2-9b-It")
     
-    # Create temporary files for uploaded PDFs
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_q:
-        temp_q.write(question_paper.read())
-        question_path = temp_q.name
+    # Load and split question paper and model answer, parsed once per file contents
+    question_chunks = load_pdf_chunks(question_paper_bytes)
+    answer_chunks = load_pdf_chunks(model_answer_bytes)
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
     
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_a:
-        temp_a.write(model_answer.read())
-        answer_path = temp_a.name
+    # Create embeddings and vector store for reference materials
+    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+    reference_docs = question_chunks + answer_chunks
+    reference_vectors = FAISS.from_documents(reference_docs, embeddings)
     
-    try:
-        # Load question paper and model answer
-        question_loader = PyPDFLoader(question_path)
-        question_docs = question_loader.load()
-        
-        answer_loader = PyPDFLoader(answer_path)
-        answer_docs = answer_loader.load()
-        
-        # Process question and model answer
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        question_chunks = text_splitter.split_documents(question_docs)
-        answer_chunks = text_splitter.split_documents(answer_docs)
-        
-        # Create embeddings and vector store for reference materials
-        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-        reference_docs = question_chunks + answer_chunks
-        reference_vectors = FAISS.from_documents(reference_docs, embeddings)
-        
-        # Create evaluation prompt template
-        evaluation_prompt = ChatPromptTemplate.from_template(
-            """You are an experienced educational evaluator tasked with grading student submissions.
+    # Create evaluation prompt template
+    evaluation_prompt = ChatPromptTemplate.from_template(
+        """You are an experienced educational evaluator tasked with grading student submissions.
 
 ### Reference Materials:
 <question_paper>
@@ -181,111 +182,129 @@ Provide your evaluation in the following JSON format:
 }}
 Ensure your evaluation is fair, constructive, and aligned with the evaluation criteria.
 """
-        )
-        # Evaluate each submission
-        results = []
-        
-        for submission in student_submissions:
-            student_email = submission.get('Student Email')
-            title = submission.get('Title')
-            submission_path = submission.get('File Path')
+    )
+    # Extract just the content from question and answer documents for context
+    question_paper_text = "\n".join([doc.page_content for doc in question_chunks])
+    model_answer_text = "\n".join([doc.page_content for doc in answer_chunks])
+    
+    def loading_error(student_email, e):
+        """Build the result row for a submission that could not be loaded or graded"""
+        print(f"Error evaluating submission for {student_email}: {e}")
+        return {
+            'Student': student_email.split('@')[0],
+            'Student Email': student_email,
+            'Score': 0,
+            'Strengths': "Error loading submission",
+            'Areas for Improvement': "Error loading submission",
+            'Detailed Analysis': f"An error occurred while loading the submission: {str(e)}",
+            'Confidence_Score': 0
+        }
+    
+    def read_submission(submission):
+        """Extract a submission's text, returning (student_answer, error_result)"""
+        try:
+            student_loader = PyMuPDFLoader(submission['File Path'])
+            student_docs = student_loader.load()
+            student_chunks = text_splitter.split_documents(student_docs)
             
-            # Skip if any required fields are missing
-            if not student_email or not title or not submission_path:
-                continue
+            # Combine all student chunks into a single text
+            return "\n".join([doc.page_content for doc in student_chunks]), None
+        
+        except Exception as e:
+            return None, loading_error(submission['Student Email'], e)
+    
+    def grade_submission(submission, loaded):
+        """Grade one submission, returning its result and whether it was graded"""
+        student_email = submission['Student Email']
+        student_answer, error_result = loaded
+        
+        if error_result:
+            return error_result, False
+        
+        try:
+            # Run the evaluation
+            response = llm.invoke(
+                evaluation_prompt.format(
+                    question_paper=question_paper_text,
+                    model_answer=model_answer_text,
+                    evaluation_criteria=evaluation_criteria,
+                    student_answer=student_answer
+                )
+            )
             
-            # Load student submission
+            # Extract JSON from response
             try:
-                student_loader = PyPDFLoader(submission_path)
-                student_docs = student_loader.load()
-                student_chunks = text_splitter.split_documents(student_docs)
-                
-                # Combine all student chunks into a single text
-                student_answer = "\n".join([doc.page_content for doc in student_chunks])
+                # Find JSON content in response
+                response_text = response.content
+                json_start = response_text.find('```json') + 7 if '```json' in response_text else response_text.find('{')
+                json_end = response_text.rfind('```') if '```' in response_text else response_text.rfind('}') + 1
                 
-                # Extract just the content from question and answer documents for context
-                question_paper_text = "\n".join([doc.page_content for doc in question_chunks])
-                model_answer_text = "\n".join([doc.page_content for doc in answer_chunks])
+                if json_start >= 0 and json_end > json_start:
+                    json_content = response_text[json_start:json_end].strip()
+                    evaluation_result = json.loads(json_content)
+                else:
+                    # Fallback if JSON parsing fails
+                    evaluation_result = {
+                        "Score": 0,
+                        "Strengths": "Error parsing evaluation",
+                        "Areas for Improvement": "Error parsing evaluation",
+                        "Detailed Analysis": response_text,
+                        "Confidence_Score": 0
+                    }
                 
-                # Run the evaluation
-                response = llm.invoke(
-                    evaluation_prompt.format(
-                        question_paper=question_paper_text,
-                        model_answer=model_answer_text,
-                        evaluation_criteria=evaluation_criteria,
-                        student_answer=student_answer
-                    )
-                )
+                # Add student information
+                evaluation_result['Student'] = student_email.split('@')[0]
+                evaluation_result['Student Email'] = student_email
                 
-                # Extract JSON from response
-                try:
-                    # Find JSON content in response
-                    response_text = response.content
-                    json_start = response_text.find('```json') + 7 if '```json' in response_text else response_text.find('{')
-                    json_end = response_text.rfind('```') if '```' in response_text else response_text.rfind('}') + 1
-                    
-                    if json_start >= 0 and json_end > json_start:
-                        json_content = response_text[json_start:json_end].strip()
-                        evaluation_result = json.loads(json_content)
-                    else:
-                        # Fallback if JSON parsing fails
-                        evaluation_result = {
-                            "Score": 0,
-                            "Strengths": "Error parsing evaluation",
-                            "Areas for Improvement": "Error parsing evaluation",
-                            "Detailed Analysis": response_text,
-                            "Confidence_Score": 0
-                        }
-                    
-                    # Add student information
-                    evaluation_result['Student'] = student_email.split('@')[0]
-                    evaluation_result['Student Email'] = student_email
-                    
-                    # Store result
-                    results.append(evaluation_result)
-                    
-                    # Save evaluation result
-                    save_evaluation_result(
-                        student_email, 
-                        submission_type, 
-                        course, 
-                        title, 
-                        evaluation_result
-                    )
-                    
-                except Exception as e:
-                    print(f"Error parsing evaluation for {student_email}: {e}")
-                    results.append({
-                        'Student': student_email.split('@')[0],
-                        'Student Email': student_email,
-                        'Score': 0,
-                        'Strengths': "Error in evaluation",
-                        'Areas for Improvement': "Error in evaluation",
-                        'Detailed Analysis': f"An error occurred during evaluation: {str(e)}",
-                        'Confidence_Score': 0
-                    })
+                return evaluation_result, True
                 
             except Exception as e:
-                print(f"Error evaluating submission for {student_email}: {e}")
-                results.append({
+                print(f"Error parsing evaluation for {student_email}: {e}")
+                return {
                     'Student': student_email.split('@')[0],
                     'Student Email': student_email,
                     'Score': 0,
-                    'Strengths': "Error loading submission",
-                    'Areas for Improvement': "Error loading submission",
-                    'Detailed Analysis': f"An error occurred while loading the submission: {str(e)}",
+                    'Strengths': "Error in evaluation",
+                    'Areas for Improvement': "Error in evaluation",
+                    'Detailed Analysis': f"An error occurred during evaluation: {str(e)}",
                     'Confidence_Score': 0
-                })
+                }, False
+            
+        except Exception as e:
+            return loading_error(student_email, e), False
+    
+    # Skip submissions with any required fields missing
+    gradable_submissions = [
+        submission for submission in student_submissions
+        if submission.get('Student Email') and submission.get('Title') and submission.get('File Path')
+    ]
+    
+    # PyMuPDF is not thread-safe, so every submission is read here first
+    loaded_submissions = [read_submission(submission) for submission in gradable_submissions]
+    
+    # Each submission waits on its own LLM call, so grade them concurrently.
+    # Results are stored and saved here, in submission order.
+    results = []
+    all_graded = True
+    
+    with ThreadPoolExecutor(max_workers=_MAX_GRADING_WORKERS) as executor:
+        graded = executor.map(grade_submission, gradable_submissions, loaded_submissions)
         
-        return results
+        for submission, (evaluation_result, is_graded) in zip(gradable_submissions, graded):
+            results.append(evaluation_result)
+            all_graded = all_graded and is_graded
+            
+            # Save evaluation result
+            if is_graded:
+                save_evaluation_result(
+                    submission['Student Email'], 
+                    submission_type, 
+                    course, 
+                    submission['Title'], 
+                    evaluation_result
+                )
     
-    finally:
-        # Clean up temporary files
-        try:
-            os.unlink(question_path)
-            os.unlink(answer_path)
-        except:
-            pass
+    return results, all_graded
 
 def save_evaluation_result(student_email, submission_type, course, title, evaluation_result):
     """Save evaluation result to disk"""
@@ -316,6 +335,7 @@ def evaluate_test_submissions(course_code, paper_title, submissions):
     llm = ChatGroq(groq_api_key=groq_api_key, model_name="Gemma2-9b-It")
     
     # Initialize plagiarism detector
+    from plagiarism_detector import PlagiarismDetector, PlagiarismDatabase
     plagiarism_detector = PlagiarismDetector()
     plagiarism_db = PlagiarismDatabase()
     
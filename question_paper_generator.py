@@ -1,7 +1,7 @@
 import os
 import json
+import uuid
 import tempfile
-import base64
 from datetime import datetime
 from fpdf import FPDF
 import streamlit as st
@@ -10,11 +10,30 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.chains import create_retrieval_chain
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
-def generate_questions_from_reference(reference_pdf, course, topics, difficulty_level, num_questions, question_types):
-    """Generate questions based on a reference PDF with proper school format"""
+def stream_question_response(llm, prompt, progress_callback=None):
+    """Stream the generated paper, reporting the number of questions received so far"""
+    marker = '"question_text"'
+    response_text = ""
+    questions_received = 0
+    
+    for chunk in llm.stream(prompt):
+        # Only the new text, plus enough overlap for a split marker, is searched
+        search_start = max(0, len(response_text) - len(marker) + 1)
+        response_text += chunk.content
+        
+        if progress_callback:
+            new_questions = response_text.count(marker, search_start)
+            if new_questions:
+                questions_received += new_questions
+                progress_callback(questions_received)
+    
+    return response_text
+
+def generate_questions_from_reference(reference_pdf_bytes, course, topics, difficulty_level, num_questions, question_types, progress_callback=None):
+    """Generate questions based on reference PDF bytes with proper school format"""
     
     # Set up the LLM
     groq_api_key = os.getenv("GROQ_API_KEY")
@@ -22,21 +41,26 @@ def generate_questions_from_reference(reference_pdf, course, topics, difficulty_
     
     # Create a temporary file for the uploaded PDF
     with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_ref:
-        temp_ref.write(reference_pdf.read())
+        temp_ref.write(reference_pdf_bytes)
         reference_path = temp_ref.name
     
     try:
-        # Load reference document
-        reference_loader = PyPDFLoader(reference_path)
-        reference_docs = reference_loader.load()
-        
-        # Process reference material
+        # Load reference pages only until the first 10 chunks used as context exist
         text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        reference_chunks = text_splitter.split_documents(reference_docs)
+        reference_chunks = []
+        
+        for page in PyMuPDFLoader(reference_path).lazy_load():
+            reference_chunks.extend(text_splitter.split_documents([page]))
+            if len(reference_chunks) >= 10:
+                break
         
         # Extract content from reference for context
         reference_text = "\n".join([doc.page_content for doc in reference_chunks[:10]])
         
+        # Scanned PDFs have no text layer to use as context
+        if not reference_text.strip():
+            return {"questions": [], "error": "No text could be extracted from the reference PDF. Please upload a PDF with selectable text."}
+        
         # Create enhanced question generation prompt for school format
         question_prompt = ChatPromptTemplate.from_template(
             """You are an experienced school question paper creator for {course}.
@@ -106,7 +130,8 @@ Create a balanced question paper that properly evaluates student understanding a
         )
         
         # Generate questions
-        response = llm.invoke(
+        response_text = stream_question_response(
+            llm,
             question_prompt.format(
                 course=course,
                 topics=topics,
@@ -114,11 +139,11 @@ Create a balanced question paper that properly evaluates student understanding a
                 num_questions=num_questions,
                 question_types=question_types,
                 reference_text=reference_text[:3000]
-            )
+            ),
+            progress_callback
         )
         
         # Extract JSON from response
-        response_text = response.content
         json_start = response_text.find('{')
         json_end = response_text.rfind('}') + 1
         
@@ -155,7 +180,7 @@ Create a balanced question paper that properly evaluates student understanding a
         except:
             pass
 
-def generate_questions_from_prompt(course, topics, difficulty_level, num_questions, question_types, custom_prompt):
+def generate_questions_from_prompt(course, topics, difficulty_level, num_questions, question_types, custom_prompt, progress_callback=None):
     """Generate questions based on custom prompt with proper school format"""
     
     # Set up the LLM
@@ -224,7 +249,8 @@ Output Format (JSON only):
         )
         
         # Generate questions
-        response = llm.invoke(
+        response_text = stream_question_response(
+            llm,
             question_prompt.format(
                 course=course,
                 topics=topics,
@@ -232,11 +258,11 @@ Output Format (JSON only):
                 num_questions=num_questions,
                 question_types=question_types,
                 custom_prompt=custom_prompt
-            )
+            ),
+            progress_callback
         )
         
         # Extract JSON from response
-        response_text = response.content
         json_start = response_text.find('{')
         json_end = response_text.rfind('}') + 1
         
@@ -477,24 +503,32 @@ def create_question_paper_pdf(questions_data, course_code, title, exam_date, dur
                 
                 pdf.ln(3)
         
-        # Save the PDF
+        # Render the PDF in memory; FPDF writes files as the latin-1 encoded buffer
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         pdf_filename = f"question_paper_{course_code}_{timestamp}.pdf"
-        pdf_path = os.path.join(tempfile.gettempdir(), pdf_filename)
-        pdf.output(pdf_path)
-        
-        # Read the PDF as bytes for download
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
-        
-        # Clean up
-        os.unlink(pdf_path)
+        pdf_bytes = pdf.output(dest='S').encode('latin-1')
         
         return pdf_bytes, pdf_filename
     
     except Exception as e:
         raise Exception(f"Error creating PDF: {str(e)}")
 
+def write_json_file(filename, data):
+    """Write JSON to a temporary file beside the target, then move it into place"""
+    # Readers of the directory never see a partially written paper. The
+    # temporary file is created like open() would, so the umask applies.
+    temp_path = f"{filename}.{uuid.uuid4().hex}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    
+    try:
+        with os.fdopen(fd, 'w') as temp_file:
+            json.dump(data, temp_file, indent=2)
+        os.replace(temp_path, filename)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
 def save_question_paper(course_code, title, questions_data, include_answers=False):
     """Save the question paper to disk"""
     try:
@@ -518,8 +552,7 @@ def save_question_paper(course_code, title, questions_data, include_answers=Fals
         }
         
         # Save to disk
-        with open(filename, 'w') as f:
-            json.dump(save_data, f, indent=2)
+        write_json_file(filename, save_data)
         
         return True
     
@@ -554,8 +587,7 @@ def publish_question_paper(course_code, title, questions_data, deadline, instruc
         }
         
         # Save to disk
-        with open(filename, 'w') as f:
-            json.dump(publish_data, f, indent=2)
+        write_json_file(filename, publish_data)
         
         print(f"Question paper published successfully to {filename}")
         return True
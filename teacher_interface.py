@@ -1,11 +1,11 @@
 import os
+import html
+import string
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-import tempfile
+from collections import defaultdict
 from datetime import datetime, timedelta
-from fpdf import FPDF
 from utils import (
     get_student_submissions, 
     save_evaluation_criteria, 
@@ -20,7 +20,116 @@ from question_paper_generator import (
     save_question_paper,
     publish_question_paper
 )
-from plagiarism_detector import PlagiarismDetector, PlagiarismDatabase, run_plagiarism_detection_batch
+
+# Custom CSS for better tab visibility in dark mode
+_TEACHER_CSS = """
+<style>
+/* Improve tab visibility for dark mode */
+.stTabs [data-baseweb="tab-list"] button [data-testid="stMarkdownContainer"] p {
+    font-size: 16px;
+    font-weight: 600;
+    color: #ffffff !important; /* White text for all tabs */
+}
+
+/* Active tab styling */
+.stTabs [data-baseweb="tab-list"] button[aria-selected="true"] {
+    background-color: #0e4b99 !important; /* Blue background for active tab */
+    border-bottom: 3px solid #1f77b4 !important; /* Blue bottom border */
+}
+
+.stTabs [data-baseweb="tab-list"] button[aria-selected="true"] [data-testid="stMarkdownContainer"] p {
+    color: #ffffff !important; /* White text for active tab */
+}
+
+/* Inactive tab styling */
+.stTabs [data-baseweb="tab-list"] button[aria-selected="false"] {
+    background-color: #2d3748 !important; /* Darker background for inactive tabs */
+    border-bottom: 2px solid #4a5568 !important; /* Gray bottom border */
+}
+
+.stTabs [data-baseweb="tab-list"] button[aria-selected="false"] [data-testid="stMarkdownContainer"] p {
+    color: #e2e8f0 !important; /* Light gray text for inactive tabs */
+}
+
+/* Hover effect for inactive tabs */
+.stTabs [data-baseweb="tab-list"] button[aria-selected="false"]:hover {
+    background-color: #4a5568 !important; /* Lighter gray on hover */
+}
+
+.stTabs [data-baseweb="tab-list"] button[aria-selected="false"]:hover [data-testid="stMarkdownContainer"] p {
+    color: #ffffff !important; /* White text on hover */
+}
+
+/* Tab list container */
+.stTabs [data-baseweb="tab-list"] {
+    background-color: #1a202c !important; /* Dark background for tab container */
+    border-radius: 8px 8px 0 0;
+    padding: 4px;
+}
+
+/* Individual tab buttons */
+.stTabs [data-baseweb="tab-list"] button {
+    border-radius: 6px !important;
+    margin: 0 2px;
+    transition: all 0.2s ease-in-out;
+}
+</style>
+"""
+
+# Default evaluation criteria for each submission type
+_DEFAULT_CRITERIA = {
+    "test": """Evaluation Criteria for Tests:
+1. Correctness: 60 points - Answer matches the expected solution
+2. Completeness: 20 points - All parts of the question are addressed
+3. Clarity: 10 points - Clear explanation of steps and reasoning
+4. Presentation: 10 points - Neat and well-organized
+
+For complex problems worth more marks, prioritize understanding of concepts over minor calculation errors.
+For simpler problems (1-2 marks), focus on the final answer being correct.""",
+    "assignment": """Evaluation Criteria for Assignments:
+1. Understanding: 30 points - Demonstrates grasp of concepts and theories
+2. Application: 30 points - Correctly applies concepts to problems
+3. Thoroughness: 20 points - Covers all aspects of the assignment
+4. Creativity: 10 points - Shows original thinking when appropriate
+5. Presentation: 10 points - Well-structured and professionally presented
+
+Higher weight questions should demonstrate deeper understanding and application.
+Lower weight questions focus on basic concept correctness.""",
+    "exam": """Evaluation Criteria for Exams:
+1. Knowledge: 40 points - Accurate recall of course material
+2. Understanding: 30 points - Demonstrates comprehension of concepts
+3. Application: 20 points - Applies knowledge to solve problems
+4. Analysis: 10 points - Critical thinking and evaluation of information
+
+For questions with higher marks, prioritize conceptual understanding and application.
+For questions with lower marks (1-2), correctness of answer is most important.""",
+    "project": """Evaluation Criteria for Projects:
+1. Research: 20 points - Depth and breadth of research conducted
+2. Methodology: 20 points - Appropriate and well-executed approach
+3. Analysis: 20 points - Critical evaluation of data and findings
+4. Innovation: 15 points - Original contributions and creative solutions
+5. Presentation: 15 points - Professional report and organization
+6. Documentation: 10 points - Clear and comprehensive documentation
+
+Focus on the overall quality and cohesiveness of the project.
+Give credit for ambitious attempts even if implementation has minor flaws.""",
+}
+
+# Options for the question editor, with index lookups for the stored values
+_QUESTION_TYPES = ("Multiple Choice", "True/False", "Fill in Blanks", "Short Answer", "Long Answer", "Numerical")
+_QUESTION_TYPE_INDEX = {question_type: i for i, question_type in enumerate(_QUESTION_TYPES)}
+_DIFFICULTY_LEVELS = ("Easy", "Medium", "Hard")
+_DIFFICULTY_INDEX = {"easy": 0, "medium": 1, "hard": 2}
+_SECTIONS = ("A", "B", "C")
+_SECTION_INDEX = {section: i for i, section in enumerate(_SECTIONS)}
+_COGNITIVE_LEVELS = ("Knowledge", "Understanding", "Application", "Analysis", "Synthesis", "Evaluation")
+_OPT_UPPER = string.ascii_uppercase
+_OPT_LOWER = string.ascii_lowercase
+_OPTION_LABELS = tuple(f"Option {letter}" for letter in _OPT_UPPER[:4])
+_STEP_LABELS = tuple(f"Step {j + 1}" for j in range(10))
+
+# Rows shown per page in long submission tables
+_TABLE_PAGE_SIZE = 50
 
 def show_teacher_interface():
     """Updated teacher interface with plagiarism detection"""
@@ -28,59 +137,7 @@ def show_teacher_interface():
     st.write(f"Welcome, {st.session_state.user_email}")
 
     # Add custom CSS for better tab visibility in dark mode
-    st.markdown("""
-    <style>
-    /* Improve tab visibility for dark mode */
-    .stTabs [data-baseweb="tab-list"] button [data-testid="stMarkdownContainer"] p {
-        font-size: 16px;
-        font-weight: 600;
-        color: #ffffff !important; /* White text for all tabs */
-    }
-    
-    /* Active tab styling */
-    .stTabs [data-baseweb="tab-list"] button[aria-selected="true"] {
-        background-color: #0e4b99 !important; /* Blue background for active tab */
-        border-bottom: 3px solid #1f77b4 !important; /* Blue bottom border */
-    }
-    
-    .stTabs [data-baseweb="tab-list"] button[aria-selected="true"] [data-testid="stMarkdownContainer"] p {
-        color: #ffffff !important; /* White text for active tab */
-    }
-    
-    /* Inactive tab styling */
-    .stTabs [data-baseweb="tab-list"] button[aria-selected="false"] {
-        background-color: #2d3748 !important; /* Darker background for inactive tabs */
-        border-bottom: 2px solid #4a5568 !important; /* Gray bottom border */
-    }
-    
-    .stTabs [data-baseweb="tab-list"] button[aria-selected="false"] [data-testid="stMarkdownContainer"] p {
-        color: #e2e8f0 !important; /* Light gray text for inactive tabs */
-    }
-    
-    /* Hover effect for inactive tabs */
-    .stTabs [data-baseweb="tab-list"] button[aria-selected="false"]:hover {
-        background-color: #4a5568 !important; /* Lighter gray on hover */
-    }
-    
-    .stTabs [data-baseweb="tab-list"] button[aria-selected="false"]:hover [data-testid="stMarkdownContainer"] p {
-        color: #ffffff !important; /* White text on hover */
-    }
-    
-    /* Tab list container */
-    .stTabs [data-baseweb="tab-list"] {
-        background-color: #1a202c !important; /* Dark background for tab container */
-        border-radius: 8px 8px 0 0;
-        padding: 4px;
-    }
-    
-    /* Individual tab buttons */
-    .stTabs [data-baseweb="tab-list"] button {
-        border-radius: 6px !important;
-        margin: 0 2px;
-        transition: all 0.2s ease-in-out;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_TEACHER_CSS, unsafe_allow_html=True)
     
     # Create main tabs - ADD plagiarism detection tab
     tabs = st.tabs([
@@ -115,23 +172,27 @@ def show_teacher_interface():
         show_plagiarism_detection_interface()
 
 
+# Each evaluation tab is a fragment, so working in one tab reruns only
+# that tab instead of the whole dashboard
+@st.fragment
 def show_evaluation_interface(submission_type):
-    st.header(f"Evaluate {submission_type.title()}s")
+    label = submission_type.title()
+    st.header(f"Evaluate {label}s")
 
     # Add unique key to the course input
-    course = st.text_input(f"Course Code for {submission_type.title()}", 
+    course = st.text_input(f"Course Code for {label}", 
                          key=f"course_code_{submission_type}")
 
     # Question paper upload
     question_paper = st.file_uploader(
-        f"Upload Question Paper for {submission_type.title()} (PDF)",
+        f"Upload Question Paper for {label} (PDF)",
         key=f"question_{submission_type}",
         type="pdf",
     )
 
     # Model answer upload
     model_answer = st.file_uploader(
-        f"Upload Model Answer for {submission_type.title()} (PDF)",
+        f"Upload Model Answer for {label} (PDF)",
         key=f"answer_{submission_type}",
         type="pdf",
     )
@@ -158,12 +219,20 @@ def show_evaluation_interface(submission_type):
             st.subheader("Student Submissions")
 
             # Display submissions in a table
-            submissions_df = pd.DataFrame(student_submissions)
+            submissions_df = get_submissions_dataframe(student_submissions)
             st.dataframe(submissions_df, use_container_width=True)
 
+            # Results are kept in session state so they survive reruns
+            results_key = f"results_{submission_type}_{course}"
+
+            reevaluate = st.checkbox(
+                "Re-evaluate instead of reusing earlier results",
+                key=f"reevaluate_{submission_type}_{course}",
+            )
+
             # Evaluate button
             if st.button(
-                f"Evaluate {submission_type.title()}s", key=f"eval_{submission_type}"
+                f"Evaluate {label}s", key=f"eval_{submission_type}"
             ):
                 if not question_paper or not model_answer:
                     st.error("Please upload both question paper and model answer.")
@@ -177,166 +246,175 @@ def show_evaluation_interface(submission_type):
                     evaluation_criteria,
                 )
 
-                # Perform evaluation
-                with st.spinner("Evaluating submissions... This may take some time."):
-                    results = evaluate_submissions(
-                        submission_type,
-                        course,
-                        question_paper,
-                        model_answer,
-                        evaluation_criteria,
-                        student_submissions,
-                    )
-
-                    # Display results
-                    display_evaluation_results(results, submission_type, course)
-
+                evaluation_args = (
+                    submission_type,
+                    course,
+                    question_paper.getvalue(),
+                    model_answer.getvalue(),
+                    evaluation_criteria,
+                    student_submissions,
+                )
 
-def get_default_criteria(submission_type):
-    # Existing code - unchanged
-    """Return default evaluation criteria based on submission type"""
-    if submission_type == "test":
-        return """Evaluation Criteria for Tests:
-1. Correctness: 60 points - Answer matches the expected solution
-2. Completeness: 20 points - All parts of the question are addressed
-3. Clarity: 10 points - Clear explanation of steps and reasoning
-4. Presentation: 10 points - Neat and well-organized
+                if reevaluate:
+                    cached_evaluate_submissions.clear(*evaluation_args)
 
-For complex problems worth more marks, prioritize understanding of concepts over minor calculation errors.
-For simpler problems (1-2 marks), focus on the final answer being correct."""
+                # Perform evaluation
+                with st.spinner("Evaluating submissions... This may take some time."):
+                    results, all_graded = cached_evaluate_submissions(*evaluation_args)
+                    st.session_state[results_key] = results
+
+                    # Failed gradings (e.g. a rate-limited LLM call) are retried on the next click
+                    if not all_graded:
+                        cached_evaluate_submissions.clear(*evaluation_args)
+                        st.warning("Some submissions could not be graded. Evaluate again to retry them.")
+
+            # Display results of the last evaluation for this course
+            if results_key in st.session_state:
+                display_evaluation_results(
+                    st.session_state[results_key], submission_type, course
+                )
 
-    elif submission_type == "assignment":
-        return """Evaluation Criteria for Assignments:
-1. Understanding: 30 points - Demonstrates grasp of concepts and theories
-2. Application: 30 points - Correctly applies concepts to problems
-3. Thoroughness: 20 points - Covers all aspects of the assignment
-4. Creativity: 10 points - Shows original thinking when appropriate
-5. Presentation: 10 points - Well-structured and professionally presented
 
-Higher weight questions should demonstrate deeper understanding and application.
-Lower weight questions focus on basic concept correctness."""
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def cached_evaluate_submissions(submission_type, course, question_paper_bytes,
+                                model_answer_bytes, evaluation_criteria, student_submissions):
+    """Evaluate submissions, reusing the results for identical uploads and criteria; returns (results, all_graded)"""
+    return evaluate_submissions(
+        submission_type,
+        course,
+        question_paper_bytes,
+        model_answer_bytes,
+        evaluation_criteria,
+        student_submissions,
+    )
 
-    elif submission_type == "exam":
-        return """Evaluation Criteria for Exams:
-1. Knowledge: 40 points - Accurate recall of course material
-2. Understanding: 30 points - Demonstrates comprehension of concepts
-3. Application: 20 points - Applies knowledge to solve problems
-4. Analysis: 10 points - Critical thinking and evaluation of information
 
-For questions with higher marks, prioritize conceptual understanding and application.
-For questions with lower marks (1-2), correctness of answer is most important."""
+@st.cache_data(ttl=60, show_spinner=False)
+def get_submissions_dataframe(student_submissions):
+    """Return the student submission records as a table"""
+    # Arrow-backed columns are handed to st.dataframe without another conversion
+    return pd.DataFrame(student_submissions).convert_dtypes(dtype_backend="pyarrow")
 
-    elif submission_type == "project":
-        return """Evaluation Criteria for Projects:
-1. Research: 20 points - Depth and breadth of research conducted
-2. Methodology: 20 points - Appropriate and well-executed approach
-3. Analysis: 20 points - Critical evaluation of data and findings
-4. Innovation: 15 points - Original contributions and creative solutions
-5. Presentation: 15 points - Professional report and organization
-6. Documentation: 10 points - Clear and comprehensive documentation
 
-Focus on the overall quality and cohesiveness of the project.
-Give credit for ambitious attempts even if implementation has minor flaws."""
+def get_default_criteria(submission_type):
+    """Return default evaluation criteria based on submission type"""
+    return _DEFAULT_CRITERIA.get(submission_type, "")
 
 
-def display_evaluation_results(results, submission_type, course):
-    # Existing code - unchanged
+def display_evaluation_results(results, submission_type, course, key=None):
+    # Widget keys default to the submission type and course
+    key = key or f"{submission_type}_{course}"
     st.subheader(f"Evaluation Results for {course} {submission_type.title()}")
 
     # Display summary statistics
     if results:
-        scores = [r.get("Score", 0) for r in results]
-        avg_score = sum(scores) / len(scores) if scores else 0
-
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Average Score", f"{avg_score:.1f}/100")
-        col2.metric("Highest Score", f"{max(scores) if scores else 0}/100")
-        col3.metric("Lowest Score", f"{min(scores) if scores else 0}/100")
-
-        # Create a dataframe for the results
+        # Create a dataframe for the results, column by column so pandas
+        # does not have to infer a dtype from every row
         results_df = pd.DataFrame(
-            [
-                {
-                    "Student": r.get("Student", ""),
-                    "Score": r.get("Score", 0),
-                    "Strengths": (
-                        r.get("Strengths", "")[:50] + "..."
-                        if r.get("Strengths", "")
-                        else ""
-                    ),
-                    "Areas for Improvement": (
-                        r.get("Areas for Improvement", "")[:50] + "..."
-                        if r.get("Areas for Improvement", "")
-                        else ""
-                    ),
-                }
-                for r in results
-            ]
+            {
+                "Student": [r.get("Student", "") for r in results],
+                "Score": pd.to_numeric(
+                    pd.Series([r.get("Score", 0) for r in results]),
+                    errors="coerce",
+                    downcast="integer",
+                ),
+                "Strengths": truncate_text_column(
+                    [r.get("Strengths", "") for r in results]
+                ),
+                "Areas for Improvement": truncate_text_column(
+                    [r.get("Areas for Improvement", "") for r in results]
+                ),
+            },
+            copy=False,
         )
 
-        st.dataframe(results_df, use_container_width=True)
+        # Summary statistics computed on the score column
+        stats = results_df["Score"].agg(["mean", "max", "min"])
 
-        # Generate and display visualizations
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
-
-        # Score distribution histogram
-        ax1.hist(scores, bins=10, edgecolor="black")
-        ax1.set_title("Score Distribution")
-        ax1.set_xlabel("Score")
-        ax1.set_ylabel("Number of Students")
-
-        # Score breakdown by different components (assuming we have this data)
-        categories = ["Understanding", "Application", "Clarity", "Presentation"]
-        example_values = np.random.rand(len(categories)) * 100  # Placeholder data
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Average Score", f"{stats['mean']:.1f}/100")
+        col2.metric("Highest Score", f"{stats['max']:g}/100")
+        col3.metric("Lowest Score", f"{stats['min']:g}/100")
 
-        ax2.bar(categories, example_values)
-        ax2.set_title("Average Score by Category")
-        ax2.set_ylabel("Score (%)")
-        ax2.set_ylim(0, 100)
+        # Results table with the detailed report of the selected student
+        display_student_reports(
+            results, results_df, f"results_table_{key}"
+        )
 
-        plt.tight_layout()
-        st.pyplot(fig)
+        # Score distribution histogram, binned here over the 0-100 scale
+        # and drawn by the browser
+        st.subheader("Score Distribution")
+        counts, edges = np.histogram(
+            results_df["Score"].dropna(), bins=10, range=(0, 100)
+        )
+        histogram_df = pd.DataFrame(
+            {"Score": edges[:-1].astype(int), "Number of Students": counts}
+        )
+        st.bar_chart(histogram_df, x="Score", y="Number of Students")
 
         # Download buttons
         st.download_button(
             label="Download Results as CSV",
-            data=results_df.to_csv(index=False),
+            data=results_to_csv(results_df),
             file_name=f"{course}_{submission_type}_results.csv",
             mime="text/csv",
+            key=f"results_csv_{key}",
         )
 
-        # Detailed individual reports
-        st.subheader("Individual Student Reports")
-        for result in results:
-            with st.expander(
-                f"Student: {result.get('Student', 'Unknown')} - Score: {result.get('Score', 0)}/100"
-            ):
-                st.markdown(f"### Feedback for {result.get('Student', 'Student')}")
 
-                st.markdown("#### Strengths")
-                st.write(result.get("Strengths", "No specific strengths identified."))
+@st.cache_data(max_entries=32, show_spinner=False)
+def results_to_csv(results_df):
+    """Serialize a results table to CSV bytes for download"""
+    return results_df.to_csv(index=False).encode("utf-8")
 
-                st.markdown("#### Areas for Improvement")
-                st.write(
-                    result.get(
-                        "Areas for Improvement",
-                        "No specific areas for improvement identified.",
-                    )
-                )
 
-                st.markdown("#### Detailed Analysis")
-                st.write(
-                    result.get("Detailed Analysis", "No detailed analysis available.")
-                )
+def truncate_text_column(values, width=50):
+    """Shorten text values for table display, marking non-empty ones with '...'"""
+    column = pd.Series(values, dtype="object").fillna("")
+    return column.str.slice(0, width).add("...").where(column != "", "")
+
+
+@st.fragment
+def display_student_reports(results, results_df, key):
+    """Show the results table and the detailed report of the selected student.
+
+    Runs as a fragment so that selecting a row only reruns this table and
+    report instead of the whole dashboard.
+    """
+    selection = st.dataframe(
+        results_df,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=key,
+    )
+
+    # Detailed individual report
+    st.subheader("Individual Student Reports")
+
+    # A kept selection can point past the end of a newer, shorter result set
+    rows = selection.selection.rows
+    if not rows or rows[0] >= len(results):
+        st.info("Select a student in the table above to view their detailed report.")
+        return
+
+    # The report is sent as one markdown element rather than one per section
+    result = results[rows[0]]
+    st.markdown(
+        f"### Feedback for {result.get('Student', 'Student')}\n\n"
+        "#### Strengths\n\n"
+        f"{result.get('Strengths', 'No specific strengths identified.')}\n\n"
+        "#### Areas for Improvement\n\n"
+        f"{result.get('Areas for Improvement', 'No specific areas for improvement identified.')}\n\n"
+        "#### Detailed Analysis\n\n"
+        f"{result.get('Detailed Analysis', 'No detailed analysis available.')}"
+    )
 
 
 def show_question_paper_generation_interface():
     """Interface for generating question papers"""
     st.header("Generate Question Papers")
     
-    # Create directory if it doesn't exist
-    os.makedirs("data/question_papers", exist_ok=True)
-    
     # Add unique key to course code input
     course_code = st.text_input("Course Code", key="gen_course_code")
     title = st.text_input("Exam/Test Title", key="gen_title")
@@ -428,16 +506,21 @@ def show_question_paper_generation_interface():
                 st.error("Please provide topics and select at least one question type.")
                 return
             
-            # Generate questions
+            # Generate questions, showing progress while the response streams in
+            progress = st.empty()
             with st.spinner("Generating questions... This may take a minute."):
                 questions_data = generate_questions_from_reference(
-                    reference_pdf,
+                    reference_pdf.getvalue(),
                     course_code,
                     topics,
                     difficulty,
                     num_questions,
-                    ", ".join(question_types)
+                    ", ".join(question_types),
+                    progress_callback=lambda received: progress.caption(
+                        f"Generated {received} of {num_questions} questions..."
+                    )
                 )
+                progress.empty()
                 
                 # Store in session state for preview
                 if "questions" in questions_data and questions_data["questions"]:
@@ -503,7 +586,8 @@ def show_question_paper_generation_interface():
                 st.error("Please provide topics, question types, and custom instructions.")
                 return
             
-            # Generate questions
+            # Generate questions, showing progress while the response streams in
+            progress = st.empty()
             with st.spinner("Generating questions... This may take a minute."):
                 questions_data = generate_questions_from_prompt(
                     course_code,
@@ -511,8 +595,12 @@ def show_question_paper_generation_interface():
                     difficulty,
                     num_questions,
                     ", ".join(question_types),
-                    custom_prompt
+                    custom_prompt,
+                    progress_callback=lambda received: progress.caption(
+                        f"Generated {received} of {num_questions} questions..."
+                    )
                 )
+                progress.empty()
                 
                 # Store in session state for preview
                 if "questions" in questions_data and questions_data["questions"]:
@@ -554,141 +642,118 @@ def show_question_paper_generation_interface():
         st.subheader("Questions")
         
         questions_data = st.session_state.generated_questions
-        edited_questions = []
         
-        for i, question in enumerate(questions_data["questions"]):
-            with st.expander(f"Question {i+1} - Section {question.get('section', 'A')} ({question['marks']} marks)"):
-                # Question metadata
-                col1, col2, col3, col4 = st.columns(4)
+        # Edits are batched in a form so typing does not rerun the page
+        with st.form("question_editor", clear_on_submit=False):
+            for i, question in enumerate(questions_data["questions"]):
+                with st.expander(f"Question {i+1} - Section {question.get('section', 'A')} ({question['marks']} marks)"):
+                    # Question metadata
+                    col1, col2, col3, col4 = st.columns(4)
                 
-                with col1:
-                    section = st.selectbox(
-                        "Section",
-                        options=["A", "B", "C"],
-                        index=["A", "B", "C"].index(question.get("section", "A")),
-                        key=f"q_section_{i}"
-                    )
+                    with col1:
+                        st.selectbox(
+                            "Section",
+                            options=_SECTIONS,
+                            index=_SECTION_INDEX.get(question.get("section", "A"), 0),
+                            key=f"q_section_{i}"
+                        )
                 
-                with col2:
-                    question_type = st.selectbox(
-                        "Question Type",
-                        options=["Multiple Choice", "True/False", "Fill in Blanks", "Short Answer", "Long Answer", "Numerical"],
-                        index=0,
-                        key=f"q_type_{i}"
-                    )
+                    with col2:
+                        question_type = st.selectbox(
+                            "Question Type",
+                            options=_QUESTION_TYPES,
+                            index=_QUESTION_TYPE_INDEX.get(question.get("question_type"), 0),
+                            key=f"q_type_{i}"
+                        )
                 
-                with col3:
-                    marks = st.number_input(
-                        "Marks",
-                        min_value=1,
-                        max_value=20,
-                        value=int(question["marks"]),
-                        key=f"q_marks_{i}"
-                    )
+                    with col3:
+                        st.number_input(
+                            "Marks",
+                            min_value=1,
+                            max_value=20,
+                            value=int(question["marks"]),
+                            key=f"q_marks_{i}"
+                        )
                 
-                with col4:
-                    difficulty = st.select_slider(
-                        "Difficulty",
-                        options=["Easy", "Medium", "Hard"],
-                        value=question["difficulty"].capitalize() if question["difficulty"] in ["easy", "medium", "hard"] else "Medium",
-                        key=f"q_diff_{i}"
-                    )
+                    with col4:
+                        st.select_slider(
+                            "Difficulty",
+                            options=_DIFFICULTY_LEVELS,
+                            value=_DIFFICULTY_LEVELS[_DIFFICULTY_INDEX.get(question["difficulty"], 1)],
+                            key=f"q_diff_{i}"
+                        )
                 
-                # Question text
-                question_text = st.text_area(
-                    "Question Text", 
-                    value=question["question_text"],
-                    key=f"q_text_{i}"
-                )
+                    # Question text
+                    st.text_area(
+                        "Question Text", 
+                        value=question["question_text"],
+                        key=f"q_text_{i}"
+                    )
                 
-                # Chapter/Unit information
-                chapter_unit = st.text_input(
-                    "Chapter/Unit Reference",
-                    value=question.get("chapter_unit", ""),
-                    key=f"q_chapter_{i}"
-                )
+                    # Chapter/Unit information
+                    st.text_input(
+                        "Chapter/Unit Reference",
+                        value=question.get("chapter_unit", ""),
+                        key=f"q_chapter_{i}"
+                    )
                 
-                # Cognitive level
-                cognitive_level = st.selectbox(
-                    "Cognitive Level",
-                    options=["Knowledge", "Understanding", "Application", "Analysis", "Synthesis", "Evaluation"],
-                    index=0,
-                    key=f"q_cognitive_{i}"
-                )
+                    # Cognitive level
+                    st.selectbox(
+                        "Cognitive Level",
+                        options=_COGNITIVE_LEVELS,
+                        index=0,
+                        key=f"q_cognitive_{i}"
+                    )
                 
-                # Options for multiple choice
-                options = []
-                if question_type == "Multiple Choice":
-                    st.subheader("Options")
+                    # Options for multiple choice
+                    if question_type == "Multiple Choice":
+                        st.subheader("Options")
                     
-                    for j in range(4):
-                        option_value = ""
-                        if "options" in question and len(question["options"]) > j:
-                            option_value = question["options"][j]
+                        for j, option_label in enumerate(_OPTION_LABELS):
+                            option_value = ""
+                            if "options" in question and len(question["options"]) > j:
+                                option_value = question["options"][j]
                         
-                        option = st.text_input(
-                            f"Option {chr(65+j)}",
-                            value=option_value,
-                            key=f"q_opt_{i}_{j}"
-                        )
-                        options.append(option)
+                            st.text_input(
+                                option_label,
+                                value=option_value,
+                                key=f"q_opt_{i}_{j}"
+                            )
                 
-                # Correct answer
-                correct_answer = st.text_area(
-                    "Correct Answer",
-                    value=question.get("correct_answer", ""),
-                    key=f"q_ans_{i}"
-                )
+                    # Correct answer
+                    st.text_area(
+                        "Correct Answer",
+                        value=question.get("correct_answer", ""),
+                        key=f"q_ans_{i}"
+                    )
                 
-                # Solution steps
-                solution_steps = []
-                if question_type == "Numerical":
-                    st.subheader("Solution Steps")
+                    # Solution steps
+                    if question_type == "Numerical":
+                        st.subheader("Solution Steps")
                     
-                    existing_steps = question.get("solution_steps", [""])
-                    num_steps = st.number_input(
-                        "Number of Steps",
-                        min_value=1,
-                        max_value=10,
-                        value=len(existing_steps),
-                        key=f"q_step_count_{i}"
-                    )
+                        existing_steps = question.get("solution_steps", [""])
+                        num_steps = st.number_input(
+                            "Number of Steps",
+                            min_value=1,
+                            max_value=len(_STEP_LABELS),
+                            value=len(existing_steps),
+                            key=f"q_step_count_{i}"
+                        )
                     
-                    for j in range(num_steps):
-                        step_value = ""
-                        if j < len(existing_steps):
-                            step_value = existing_steps[j]
+                        for j in range(num_steps):
+                            step_value = ""
+                            if j < len(existing_steps):
+                                step_value = existing_steps[j]
                             
-                        step = st.text_input(
-                            f"Step {j+1}",
-                            value=step_value,
-                            key=f"q_step_{i}_{j}"
-                        )
-                        solution_steps.append(step)
-                
-                # Collect edited question
-                edited_question = {
-                    "question_number": i + 1,
-                    "question_text": question_text,
-                    "question_type": question_type,
-                    "marks": marks,
-                    "difficulty": difficulty.lower(),
-                    "correct_answer": correct_answer,
-                    "section": section,
-                    "chapter_unit": chapter_unit
-                }
-                
-                if question_type == "Multiple Choice":
-                    edited_question["options"] = options
-                
-                if question_type == "Numerical" and solution_steps:
-                    edited_question["solution_steps"] = solution_steps
-                
-                edited_questions.append(edited_question)
-        
-        # Update the questions data
-        questions_data["questions"] = edited_questions
-        st.session_state.generated_questions = questions_data
+                            st.text_input(
+                                _STEP_LABELS[j],
+                                value=step_value,
+                                key=f"q_step_{i}_{j}"
+                            )
+            
+            # Widget values live in session state; fold them back only on submit
+            if st.form_submit_button("Apply Changes"):
+                questions_data["questions"] = collect_edited_questions(len(questions_data["questions"]))
         
         # ADD THIS PREVIEW SECTION HERE:
         st.markdown("---")
@@ -696,7 +761,9 @@ def show_question_paper_generation_interface():
         
         # Show formatted preview
         if st.button("📋 Show Formatted Preview", key="show_preview"):
-            show_question_paper_preview(questions_data, course_code, title, school_info)
+            show_question_paper_preview(
+                questions_data, course_code, title, school_info, datetime.now().strftime('%d/%m/%Y')
+            )
         
         st.markdown("---")
         
@@ -707,7 +774,7 @@ def show_question_paper_generation_interface():
             if st.button("Generate PDF", key="gen_pdf_btn"):
                 try:
                     # Create PDF with school information
-                    pdf_bytes, pdf_filename = create_question_paper_pdf(
+                    pdf_bytes = build_question_paper_pdf(
                         questions_data,
                         course_code,
                         title,
@@ -718,6 +785,10 @@ def show_question_paper_generation_interface():
                         school_info  # Add school info parameter
                     )
                     
+                    # The file name carries the time of this click, not of the cached build
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    pdf_filename = f"question_paper_{course_code}_{timestamp}.pdf"
+                    
                     # Provide download button
                     st.session_state.pdf_bytes = pdf_bytes
                     st.session_state.pdf_filename = pdf_filename
@@ -804,10 +875,6 @@ def show_question_paper_generation_interface():
                 st.error("Cannot publish a question paper with no questions.")
             else:
                 try:
-                    # Create directories if they don't exist
-                    os.makedirs("data/published_papers", exist_ok=True)
-                    os.makedirs(f"data/published_papers/{course_code}", exist_ok=True)
-                    
                     # Publish the question paper
                     success = publish_question_paper(
                         course_code,
@@ -837,6 +904,55 @@ def show_question_paper_generation_interface():
                     st.error(f"Error publishing question paper: {str(e)}")
                     st.error("Please check that all required data is provided and try again.")
 
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_question_paper_pdf(questions_data, course_code, title, exam_date, duration,
+                             instructions, include_answers, school_info):
+    """Create the question paper PDF bytes, reusing the last build for unchanged inputs"""
+    pdf_bytes, _ = create_question_paper_pdf(
+        questions_data,
+        course_code,
+        title,
+        exam_date,
+        duration,
+        instructions,
+        include_answers,
+        school_info
+    )
+    return pdf_bytes
+
+
+def collect_edited_questions(num_questions):
+    """Build the edited question list from the question editor widget state"""
+    state = st.session_state
+    edited_questions = []
+    
+    for i in range(num_questions):
+        question_type = state[f"q_type_{i}"]
+        edited_question = {
+            "question_number": i + 1,
+            "question_text": state[f"q_text_{i}"],
+            "question_type": question_type,
+            "marks": state[f"q_marks_{i}"],
+            "difficulty": state[f"q_diff_{i}"].lower(),
+            "correct_answer": state[f"q_ans_{i}"],
+            "section": state[f"q_section_{i}"],
+            "chapter_unit": state[f"q_chapter_{i}"]
+        }
+        
+        if question_type == "Multiple Choice":
+            edited_question["options"] = [state[f"q_opt_{i}_{j}"] for j in range(len(_OPTION_LABELS))]
+        
+        if question_type == "Numerical":
+            solution_steps = [state[f"q_step_{i}_{j}"] for j in range(state[f"q_step_count_{i}"])]
+            if solution_steps:
+                edited_question["solution_steps"] = solution_steps
+        
+        edited_questions.append(edited_question)
+    
+    return edited_questions
+
+
 # Update the show_published_papers_interface function to fix the evaluation process
 def show_published_papers_interface():
     """Interface for managing published question papers"""
@@ -857,8 +973,11 @@ def show_published_papers_interface():
         return
     
     # Display papers in a selection box
-    paper_titles = [f"{paper['title']} (Published: {paper['created_date']})" for paper in published_papers]
-    selected_paper_idx = st.selectbox("Select Paper", range(len(paper_titles)), format_func=lambda x: paper_titles[x])
+    selected_paper_idx = st.selectbox(
+        "Select Paper",
+        range(len(published_papers)),
+        format_func=lambda x: f"{published_papers[x]['title']} (Published: {published_papers[x]['created_date']})",
+    )
     
     # Get the selected paper
     selected_paper = published_papers[selected_paper_idx]
@@ -866,40 +985,67 @@ def show_published_papers_interface():
     # Display paper details
     st.subheader(f"Paper Details: {selected_paper['title']}")
     
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.write(f"**Course:** {selected_paper['course']}")
-        st.write(f"**Published:** {selected_paper['created_date']}")
-    
-    with col2:
-        st.write(f"**Deadline:** {selected_paper.get('deadline', 'Not specified')}")
-        st.write(f"**Status:** {selected_paper.get('status', 'Active')}")
-        
-    with col3:
-        if selected_paper.get('time_limit'):
-            hours = selected_paper['time_limit'] // 60
-            minutes = selected_paper['time_limit'] % 60
-            time_display = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
-            st.write(f"**Time Limit:** {time_display}")
-        else:
-            st.write("**Time Limit:** None")
+    if selected_paper.get('time_limit'):
+        hours = selected_paper['time_limit'] // 60
+        minutes = selected_paper['time_limit'] % 60
+        time_display = f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+    else:
+        time_display = "None"
+    
+    # The details are sent to the browser as a single table, with the stored values escaped
+    st.markdown(
+        f"""<table style="width: 100%">
+<tr><td><b>Course:</b> {html.escape(str(selected_paper['course']))}</td>
+<td><b>Deadline:</b> {html.escape(str(selected_paper.get('deadline', 'Not specified')))}</td>
+<td><b>Time Limit:</b> {html.escape(time_display)}</td></tr>
+<tr><td><b>Published:</b> {html.escape(str(selected_paper['created_date']))}</td>
+<td><b>Status:</b> {html.escape(str(selected_paper.get('status', 'Active')))}</td>
+<td></td></tr>
+</table>""",
+        unsafe_allow_html=True,
+    )
     
-    # Option to view paper content
-    if st.button("View Paper Content"):
+    # Each part reruns on its own when its widgets are used
+    show_paper_content(course_code, selected_paper)
+    show_paper_submissions(course_code, selected_paper)
+
+
+@st.fragment
+def show_paper_content(course_code, selected_paper):
+    """Show the questions of a published paper"""
+    # A toggle keeps the content open while a question is picked below
+    if st.toggle("View Paper Content", key=f"view_paper_{course_code}_{selected_paper['title']}"):
         st.subheader("Questions")
         
-        for i, question in enumerate(selected_paper["questions"]):
-            with st.expander(f"Q{i+1}: {question['question_text'][:50]}... ({question['marks']} marks)"):
-                st.write(question["question_text"])
-                
-                if "options" in question and question["options"]:
-                    st.write("**Options:**")
-                    for j, option in enumerate(question["options"]):
-                        st.write(f"{chr(65+j)}. {option}")
-                
-                st.write(f"**Correct Answer:** {question['correct_answer']}")
-    
-    # View student submissions
+        questions = selected_paper["questions"]
+        headers = [
+            f"Q{i+1}: {question['question_text']:.50}... ({question['marks']} marks)"
+            for i, question in enumerate(questions)
+        ]
+        
+        # Only the selected question is rendered
+        idx = st.selectbox(
+            "Question",
+            range(len(questions)),
+            format_func=lambda i: headers[i],
+            key=f"view_question_{course_code}_{selected_paper['title']}",
+        )
+        
+        if idx is not None:
+            question = questions[idx]
+            st.write(question["question_text"])
+            
+            if "options" in question and question["options"]:
+                st.write("**Options:**")
+                for j, option in enumerate(question["options"]):
+                    st.write(f"{_OPT_UPPER[j]}. {option}")
+            
+            st.write(f"**Correct Answer:** {question['correct_answer']}")
+
+
+@st.fragment
+def show_paper_submissions(course_code, selected_paper):
+    """Show student submissions for a published paper and evaluate them"""
     st.subheader("Student Submissions")
     
     # Get submissions for this paper
@@ -908,52 +1054,106 @@ def show_published_papers_interface():
     if not submissions:
         st.info("No student submissions yet.")
     else:
-        # Create DataFrame for submissions
-        submissions_df = pd.DataFrame([
+        # Create DataFrame for submissions, column by column
+        submissions_df = pd.DataFrame(
             {
-                "Student": sub["student_email"].split("@")[0],
-                "Submission Date": sub["submission_date"],
-                "Status": sub.get("evaluation_status", "Pending")
-            }
-            for sub in submissions
-        ])
+                "Student": pd.Series(
+                    [sub["student_email"] for sub in submissions]
+                ).str.split("@", n=1).str[0],
+                "Submission Date": [sub["submission_date"] for sub in submissions],
+                "Status": [sub.get("evaluation_status", "Pending") for sub in submissions],
+            },
+            copy=False,
+        )
+        
+        show_paginated_dataframe(
+            submissions_df, f"submissions_page_{course_code}_{selected_paper['title']}"
+        )
+        
+        # Results are kept in session state so they survive reruns
+        paper_key = f"{course_code}_{selected_paper['title']}"
+        results_key = f"test_results_{paper_key}"
         
-        st.dataframe(submissions_df, use_container_width=True)
+        reevaluate = st.checkbox(
+            "Re-evaluate instead of reusing earlier results", key=f"reevaluate_{paper_key}"
+        )
         
         # Option to evaluate submissions
         if st.button("Evaluate Submissions"):
+            # Each submission is identified by its student and submission time
+            evaluation_args = (
+                course_code,
+                selected_paper["title"],
+                selected_paper["questions"],
+                tuple((sub.get("student_email"), sub.get("submission_date")) for sub in submissions),
+                submissions,
+            )
+            
+            if reevaluate:
+                cached_evaluate_test_submissions.clear(*evaluation_args)
+            
             with st.spinner("Evaluating submissions... This may take some time."):
                 # Use our new evaluation function that handles JSON submissions directly
-                results, message = evaluate_test_submissions(
-                    course_code,
-                    selected_paper["title"],
-                    submissions
-                )
+                results, message = cached_evaluate_test_submissions(*evaluation_args)
                 
                 if results:
-                    # Display results
-                    display_evaluation_results(results, "test", course_code)
+                    st.session_state[results_key] = results
                 else:
+                    # A failed evaluation is not reused on the next click
+                    cached_evaluate_test_submissions.clear(*evaluation_args)
                     st.error(f"Evaluation failed: {message}")
+        
+        # Display results of the last evaluation for this paper
+        if results_key in st.session_state:
+            display_evaluation_results(
+                st.session_state[results_key], "test", course_code, key=paper_key
+            )
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def cached_evaluate_test_submissions(course_code, paper_title, paper_questions,
+                                     submission_keys, _submissions):
+    """Evaluate test submissions, reusing the results for unchanged papers and submissions"""
+    # Submissions are rewritten with their status after evaluation, so they are keyed by submission_keys
+    return evaluate_test_submissions(course_code, paper_title, _submissions)
+
+def show_paginated_dataframe(df, key, page_size=_TABLE_PAGE_SIZE):
+    """Show a table one page at a time once it has more rows than fit on a page"""
+    if len(df) <= page_size:
+        st.dataframe(df, use_container_width=True)
+        return
+    
+    # The page number is a keyed widget, so it survives unrelated reruns
+    num_pages = -(-len(df) // page_size)
+    page = st.number_input(
+        f"Page (of {num_pages})", min_value=1, max_value=num_pages, value=1, key=key
+    )
+    start = (page - 1) * page_size
+    st.dataframe(df.iloc[start:start + page_size], use_container_width=True)
+    st.caption(f"Showing rows {start + 1}-{min(start + page_size, len(df))} of {len(df)}")
 
 # Add this function to show a preview of the formatted question paper
 
-def show_question_paper_preview(questions_data, course_code, title, school_info):
+def show_question_paper_preview(questions_data, course_code, title, school_info, paper_date):
     """Show a preview of how the question paper will look"""
     st.subheader("📋 Question Paper Preview")
     
+    school_name = school_info.get('school_name', 'SCHOOL NAME')
+    academic_year = school_info.get('academic_year', '2024-2025')
+    grade = school_info.get('grade', 'Grade X')
+    
     # Header preview
     st.markdown("---")
-    st.markdown(f"<h2 style='text-align: center'>{school_info.get('school_name', 'SCHOOL NAME')}</h2>", unsafe_allow_html=True)
-    st.markdown(f"<p style='text-align: center'>Academic Year: {school_info.get('academic_year', '2024-2025')}</p>", unsafe_allow_html=True)
+    st.markdown(f"<h2 style='text-align: center'>{school_name}</h2>", unsafe_allow_html=True)
+    st.markdown(f"<p style='text-align: center'>Academic Year: {academic_year}</p>", unsafe_allow_html=True)
     st.markdown("---")
     
     # Paper details table
     col1, col2 = st.columns(2)
     with col1:
-        st.write(f"**Class/Grade:** {school_info.get('grade', 'Grade X')}")
+        st.write(f"**Class/Grade:** {grade}")
         st.write(f"**Time:** 3 hours")
-        st.write(f"**Date:** {datetime.now().strftime('%d/%m/%Y')}")
+        st.write(f"**Date:** {paper_date}")
     
     with col2:
         st.write(f"**Subject:** {course_code}")
@@ -963,12 +1163,10 @@ def show_question_paper_preview(questions_data, course_code, title, school_info)
     st.markdown("---")
     
     # Questions by section
-    questions = questions_data.get("questions", [])
-    sections = {"A": [], "B": [], "C": []}
+    sections = defaultdict(list)
     
-    for q in questions:
-        section = q.get("section", "A").upper()
-        sections[section].append(q)
+    for q in questions_data.get("questions", []):
+        sections[q.get("section", "A").upper()].append(q)
     
     section_titles = {
         "A": "Section A: Objective Questions (1 Mark each)",
@@ -976,31 +1174,35 @@ def show_question_paper_preview(questions_data, course_code, title, school_info)
         "C": "Section C: Long Answer Questions (6-10 Marks each)"
     }
     
-    for section_key in ["A", "B", "C"]:
-        if sections[section_key]:
-            st.markdown(f"### {section_titles[section_key]}")
+    for section_key in ("A", "B", "C"):
+        bucket = sections.get(section_key)
+        if not bucket:
+            continue
+        
+        parts = [f"### {section_titles[section_key]}"]
+        
+        for q in bucket:
+            marks = q.get('marks', 1)
+            chapter = q.get('chapter_unit')
             
-            for q in sections[section_key]:
-                with st.container():
-                    # Question header
-                    marks_text = f"({q.get('marks', 1)} Mark{'s' if q.get('marks', 1) > 1 else ''})"
-                    st.markdown(f"**Q{q.get('question_number', '')}. {marks_text}**")
-                    
-                    # Chapter reference
-                    if q.get('chapter_unit'):
-                        st.markdown(f"*[{q.get('chapter_unit')}]*")
-                    
-                    # Question text
-                    st.write(q.get('question_text', ''))
-                    
-                    # Options for MCQs
-                    if q.get('question_type', '').lower() in ['multiple choice', 'mcq'] and q.get('options'):
-                        for i, option in enumerate(q['options']):
-                            st.write(f"({chr(97+i)}) {option}")
-                    
-                    st.write("")  # Space between questions
+            # Question header
+            marks_text = f"({marks} Mark{'s' if marks > 1 else ''})"
+            parts.append(f"**Q{q.get('question_number', '')}. {marks_text}**")
             
-            st.markdown("---")
+            # Chapter reference
+            if chapter:
+                parts.append(f"*[{chapter}]*")
+            
+            # Question text
+            parts.append(q.get('question_text', ''))
+            
+            # Options for MCQs
+            if q.get('question_type', '').lower() in ('multiple choice', 'mcq') and q.get('options'):
+                parts.extend(f"({_OPT_LOWER[i]}) {option}" for i, option in enumerate(q['options']))
+        
+        # Each section is sent to the browser as a single markdown element
+        parts.append("---")
+        st.markdown("\n\n".join(parts))
     
     # Paper analysis
     st.subheader("📊 Question Paper Analysis")
@@ -1008,6 +1210,10 @@ def show_question_paper_preview(questions_data, course_code, title, school_info)
     paper_info = questions_data.get('paper_info', {})
     sections_info = paper_info.get('sections', {})
     
+    # Look up each section's counts once
+    section_rows = [sections_info.get(f'section_{s}', {}) for s in ['a', 'b', 'c']]
+    question_counts = [row.get('questions', 0) for row in section_rows]
+    
     analysis_data = {
         "Section": ["A", "B", "C", "Total"],
         "Type of Questions": [
@@ -1016,19 +1222,9 @@ def show_question_paper_preview(questions_data, course_code, title, school_info)
             "Long Answer", 
             "ALL"
         ],
-        "No. of Questions": [
-            sections_info.get('section_a', {}).get('questions', 0),
-            sections_info.get('section_b', {}).get('questions', 0),
-            sections_info.get('section_c', {}).get('questions', 0),
-            sum([sections_info.get(f'section_{s}', {}).get('questions', 0) for s in ['a', 'b', 'c']])
-        ],
+        "No. of Questions": question_counts + [sum(question_counts)],
         "Marks per Question": ["1", "3-5", "6-10", "-"],
-        "Total Marks": [
-            sections_info.get('section_a', {}).get('total_marks', 0),
-            sections_info.get('section_b', {}).get('total_marks', 0),
-            sections_info.get('section_c', {}).get('total_marks', 0),
-            paper_info.get('total_marks', 0)
-        ]
+        "Total Marks": [row.get('total_marks', 0) for row in section_rows] + [paper_info.get('total_marks', 0)]
     }
     
     analysis_df = pd.DataFrame(analysis_data)
@@ -1134,6 +1330,7 @@ def show_run_plagiarism_detection():
             progress_bar.progress(30)
             
             # Run detection
+            from plagiarism_detector import run_plagiarism_detection_batch
             results = run_plagiarism_detection_batch(course_param, type_param)
             progress_bar.progress(80)
             
@@ -1178,6 +1375,7 @@ def show_plagiarism_results():
     """Display plagiarism detection results"""
     st.subheader("📊 Plagiarism Detection Results")
     
+    from plagiarism_detector import PlagiarismDatabase
     db = PlagiarismDatabase()
     
     # Filter options
@@ -1309,6 +1507,7 @@ def show_plagiarism_analytics():
     """Show plagiarism analytics and trends"""
     st.subheader("📈 Plagiarism Analytics")
     
+    from plagiarism_detector import PlagiarismDatabase
     db = PlagiarismDatabase()
     all_results = db.get_plagiarism_results()
     
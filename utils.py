@@ -151,6 +151,9 @@ def process_submission(file, submission_type, course, title, user_email):
         with open(record_path, "w") as f:
             json.dump(submissions, f, indent=2)
 
+        # Let teachers see the new submission without waiting for the cache
+        get_student_submissions.clear()
+
         return True, f"Your {submission_type} has been successfully submitted!"
 
     except Exception as e:
@@ -274,6 +277,7 @@ def get_submission_history(user_email):
     return submissions
 
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_student_submissions(submission_type, course):
     """Get all student submissions for a specific submission type and course"""
     submissions = []
@@ -377,50 +381,71 @@ def get_saved_question_papers(course_code=None):
 
 # Add these new functions at the end of the file
 
+def json_files_fingerprint(directories):
+    """Return the path and modification time of the JSON files in the given directories"""
+    fingerprint = []
+    for directory in directories:
+        for filename in os.listdir(directory):
+            if filename.endswith('.json'):
+                path = os.path.join(directory, filename)
+                fingerprint.append((path, os.stat(path).st_mtime_ns))
+    
+    return tuple(sorted(fingerprint))
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def load_json_files(fingerprint):
+    """Load the JSON files listed in a fingerprint, cached until one of them changes"""
+    records = []
+    
+    for path, _ in fingerprint:
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+                
+                # Add the file path to the data
+                record["file_path"] = path
+                records.append(record)
+        except Exception as e:
+            print(f"Error loading {path}: {e}")
+            continue
+    
+    return records
+
 def get_published_question_papers(student_email=None, course_code=None):
     """Get question papers published for students, filter by course if specified"""
-    papers = []
     base_dir = "data/published_papers"
     
     if not os.path.exists(base_dir):
-        return papers
+        return []
     
     # Get all course directories
     course_dirs = [course_code] if course_code else os.listdir(base_dir)
+    course_paths = [os.path.join(base_dir, course) for course in course_dirs]
+    course_paths = [path for path in course_paths if os.path.isdir(path)]
     
-    for course in course_dirs:
-        course_path = os.path.join(base_dir, course)
-        if not os.path.isdir(course_path):
+    # Paper files are only re-read when one of them changes on disk
+    papers = []
+    
+    for paper_data in load_json_files(json_files_fingerprint(course_paths)):
+        try:
+            # Check if the deadline has passed
+            if "deadline" in paper_data:
+                deadline = datetime.strptime(paper_data["deadline"], "%Y-%m-%d")
+                if deadline < datetime.now():
+                    paper_data["status"] = "expired"
+            
+            # Check if the student has already submitted this paper
+            if student_email:
+                submission_path = f"data/submissions/test/{paper_data['course']}/{paper_data['title']}/{student_email.replace('@', '_at_')}.json"
+                if os.path.exists(submission_path):
+                    paper_data["student_status"] = "submitted"
+                else:
+                    paper_data["student_status"] = "not_submitted"
+            
+            papers.append(paper_data)
+        except Exception as e:
+            print(f"Error loading paper {os.path.basename(paper_data['file_path'])}: {e}")
             continue
-        
-        # Get all JSON files in the course directory
-        for filename in os.listdir(course_path):
-            if filename.endswith('.json'):
-                try:
-                    with open(os.path.join(course_path, filename), 'r') as f:
-                        paper_data = json.load(f)
-                        
-                        # Add the file path to the data
-                        paper_data["file_path"] = os.path.join(course_path, filename)
-                        
-                        # Check if the deadline has passed
-                        if "deadline" in paper_data:
-                            deadline = datetime.strptime(paper_data["deadline"], "%Y-%m-%d")
-                            if deadline < datetime.now():
-                                paper_data["status"] = "expired"
-                        
-                        # Check if the student has already submitted this paper
-                        if student_email:
-                            submission_path = f"data/submissions/test/{paper_data['course']}/{paper_data['title']}/{student_email.replace('@', '_at_')}.json"
-                            if os.path.exists(submission_path):
-                                paper_data["student_status"] = "submitted"
-                            else:
-                                paper_data["student_status"] = "not_submitted"
-                        
-                        papers.append(paper_data)
-                except Exception as e:
-                    print(f"Error loading paper {filename}: {e}")
-                    continue
     
     # Sort by creation date (newest first)
     papers.sort(key=lambda x: x.get("created_date", ""), reverse=True)
@@ -614,45 +639,22 @@ def get_test_submission(student_email, course_code, paper_title):
 
 def get_test_submissions_for_course(course_code, paper_title=None):
     """Get all student submissions for a course/paper"""
-    submissions = []
     base_path = f"data/submissions/test/{course_code}"
     
     if not os.path.exists(base_path):
-        return submissions
+        return []
     
     # If paper title is specified, only look for that paper
     if paper_title:
-        paper_path = os.path.join(base_path, paper_title)
-        if not os.path.exists(paper_path):
-            return submissions
-            
-        for filename in os.listdir(paper_path):
-            if filename.endswith('.json'):
-                try:
-                    filepath = os.path.join(paper_path, filename)
-                    with open(filepath, 'r') as f:
-                        submission = json.load(f)
-                        submission["file_path"] = filepath
-                        submissions.append(submission)
-                except:
-                    continue
+        paper_paths = [os.path.join(base_path, paper_title)]
     else:
         # Get all papers for the course
-        for paper_dir in os.listdir(base_path):
-            paper_path = os.path.join(base_path, paper_dir)
-            if os.path.isdir(paper_path):
-                for filename in os.listdir(paper_path):
-                    if filename.endswith('.json'):
-                        try:
-                            filepath = os.path.join(paper_path, filename)
-                            with open(filepath, 'r') as f:
-                                submission = json.load(f)
-                                submission["file_path"] = filepath
-                                submissions.append(submission)
-                        except:
-                            continue
+        paper_paths = [os.path.join(base_path, paper_dir) for paper_dir in os.listdir(base_path)]
     
-    return submissions
+    paper_paths = [path for path in paper_paths if os.path.isdir(path)]
+    
+    # Submission files are only re-read when one of them changes on disk
+    return load_json_files(json_files_fingerprint(paper_paths))
 
 def update_active_tests():
     """Update the status of tests based on their deadlines"""